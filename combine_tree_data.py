@@ -1,44 +1,258 @@
 #!/usr/bin/env python3
 """
-Montreal Tree Data Combiner - Combines 7 CSV files into one GeoJSON
+Montreal Tree Data Combiner - Combines 7 CSV files into one column-major JSON
 """
 
 import csv
+import fnmatch
 import json
-import glob
 import os
+import re
 import sys
-from datetime import datetime
+from array import array
+from itertools import islice
+from multiprocessing import Pool
+from operator import itemgetter
+from sys import intern
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 1 MiB I/O buffers instead of the 8 KiB default, to cut read/write syscalls
+BUFFER_SIZE = 1 << 20
+
+def dumps(obj):
+    """Encode obj as compact UTF-8 JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 def parse_date(date_string):
-    """Parse date and return year between 1850-2025, or None"""
-    if not date_string or date_string.strip() == '':
+    """Parse date and return year between 1850-2025, or None
+    
+    Dates are ISO formatted (YYYY-MM-DD[T00:00:00]), so only the first
+    four characters are read instead of building a datetime per row.
+    """
+    if not date_string or len(date_string) < 4:
         return None
-    try:
-        date_obj = datetime.fromisoformat(date_string.replace('T00:00:00', ''))
-        year = date_obj.year
-        return year if 1850 <= year <= 2025 else None
-    except:
+    year = date_string[:4]
+    if not (year.isascii() and year.isdigit()):
         return None
+    year = int(year)
+    return year if 1850 <= year <= 2025 else None
+
+# Output columns, in the order they are written. The data file is
+# column-major: one array per column instead of one object per tree, so the
+# property names are written once rather than on every feature, and
+# coordinates are flat number arrays rather than one [lon, lat] per tree.
+COLUMNS = (
+    'longitude',
+    'latitude',
+    'arrondissement',
+    'rue',
+    'emplacement',
+    'tree_type_latin',
+    'tree_type_french',
+    'tree_type_english',
+    'diameter',
+    'plantation_year',
+)
+
+# Columns with few distinct values, written as integer ids into a
+# "dictionaries" lookup table instead of repeating the strings on every tree
+DICTIONARY_COLUMNS = (
+    'arrondissement',
+    'rue',
+    'emplacement',
+    'tree_type_latin',
+    'tree_type_french',
+    'tree_type_english',
+)
+
+def dictionary_encode(values):
+    """Split values into (dictionary, ids) so dictionary[ids[i]] == values[i]"""
+    index = {}
+    ids = array('i', [index.setdefault(value, len(index)) for value in values])
+    return list(index), ids
+
+def merge_dictionaries(parts):
+    """Merge per-file (dictionary, ids) parts into one sorted dictionary
+    
+    Returns (dictionary, chunks) where chunks holds each part's ids,
+    renumbered against the merged dictionary, as comma-joined JSON bytes.
+    """
+    dictionary = sorted(set().union(*(values for values, ids in parts)))
+    position = {value: i for i, value in enumerate(dictionary)}
+    chunks = []
+    for values, ids in parts:
+        remap = [position[value] for value in values]
+        chunks.append(dumps([remap[i] for i in ids])[1:-1])
+    return dictionary, chunks
+
+def scan_trees(reader, headers):
+    """Lazily filter and project CSV rows into tree value tuples
+    
+    Yields (lon, lat, arrondissement, rue, emplacement, tree_type_latin,
+    tree_type_french, tree_type_english, diameter, plantation_date).
+    Dates are left raw; years are derived per column in process_file().
+    Rows without valid coordinates are dropped before any property is read
+    and yield None, so callers can still count them as skipped.
+    """
+    # Resolve column positions once instead of hashing names on every row,
+    # and pull every property column out of a row in a single C-level call
+    column = {name: i for i, name in enumerate(headers)}
+    coordinates = itemgetter(column['Longitude'], column['Latitude'])
+    project = itemgetter(
+        column['ARROND_NOM'],
+        column['Rue'],
+        column['Emplacement'],
+        column['Essence_latin'],
+        column['Essence_fr'],
+        column['Essence_ang'],
+        column['DHP'],
+        column['Date_Plantation'],
+    )
+    
+    for row in reader:
+        # Blank lines come back as [] - DictReader skipped them, so don't
+        # count them as rows
+        if not row:
+            continue
+        
+        # Filter on coordinates first. Empty cells are the usual dirty case,
+        # so reject them with a truth test instead of letting float() raise
+        try:
+            lon, lat = coordinates(row)
+            if not (lon and lat):
+                yield None
+                continue
+            lon = float(lon)
+            lat = float(lat)
+        except (ValueError, IndexError):
+            yield None
+            continue
+        
+        # One chained range check per axis: zero, near-zero, out-of-range,
+        # NaN and inf coordinates all fail it
+        if not (10 <= abs(lon) <= 180 and 10 <= abs(lat) <= 90):
+            yield None
+            continue
+        
+        # Project only the columns the map needs. The string columns repeat
+        # a small set of values, so intern them to keep one copy of each.
+        # csv.reader gives '' for empty cells, never None, so only the
+        # columns with a non-empty default need a fallback
+        arrondissement, rue, emplacement, latin, french, english, dhp, date = project(row)
+        yield (
+            lon,
+            lat,
+            intern(arrondissement),
+            intern(rue.strip()),
+            intern(emplacement.strip()),
+            intern(latin or 'Unknown'),
+            intern(french or 'Inconnu'),
+            intern(english or 'Unknown'),
+            intern(dhp),
+            date,
+        )
+
+def process_file(csv_file, headers=None):
+    """Read one CSV file into encoded output columns
+    
+    Runs in a worker process. Pass headers=None for a file that starts with
+    its own header row. Returns (columns, tree_types, year_min, year_max,
+    counts) where columns maps each name in COLUMNS to its comma-joined
+    JSON values as bytes, or to a file-local (dictionary, ids) pair for
+    DICTIONARY_COLUMNS.
+    """
+    trees = []
+    skipped = 0
+    
+    with open(csv_file, 'r', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        if headers is None:
+            headers = next(reader)
+        
+        for tree in scan_trees(reader, headers):
+            if tree is None:
+                skipped += 1
+                continue
+            trees.append(tree)
+    
+    # Transpose rows into columns in one pass
+    *values, dates = list(zip(*trees)) or [()] * len(COLUMNS)
+    columns = dict(zip(COLUMNS[:-1], values))
+    
+    # Plantation years as a column pass: trees share a few thousand distinct
+    # dates, so parse each one once and map the column through the results
+    year_of = {date: parse_date(date) or 0 for date in set(dates)}
+    columns['plantation_year'] = list(map(year_of.__getitem__, dates))
+    years = array('i', filter(None, columns['plantation_year']))
+    
+    # Encode whole columns at once, minus the surrounding brackets
+    encoded = {
+        name: dictionary_encode(columns[name]) if name in DICTIONARY_COLUMNS
+        else dumps(columns[name])[1:-1]
+        for name in COLUMNS
+    }
+    
+    counts = {
+        'rows': len(trees) + skipped,
+        'valid': len(trees),
+        'skipped': skipped,
+        'with_dates': len(years),
+    }
+    year_min = min(years) if years else None
+    year_max = max(years) if years else None
+    
+    # Tree types - use French for dropdown. The column's dictionary already
+    # holds each distinct name once, so no second pass over the trees
+    tree_types, _ = encoded['tree_type_french']
+    return encoded, set(tree_types), year_min, year_max, counts
 
 def combine_csv_files(pattern='arbres-part-*.csv', output_file='trees_combined.json'):
-    """Combine all CSV files and create GeoJSON"""
+    """Combine all CSV files and create the column-major tree data file"""
     
     print(f"\nCurrent directory: {os.getcwd()}")
     print(f"Looking for: {pattern}\n")
     
-    csv_files = sorted(glob.glob(pattern))
+    # Wildcards apply to the file name only; like glob, hidden files are
+    # skipped unless the pattern itself starts with a dot
+    directory, name_pattern = os.path.split(pattern)
+    match = re.compile(fnmatch.translate(name_pattern)).match
+    show_hidden = name_pattern.startswith('.')
+    try:
+        with os.scandir(directory or '.') as entries:
+            csv_files = sorted(
+                os.path.join(directory, entry.name) for entry in entries
+                if match(entry.name) and (show_hidden or not entry.name.startswith('.'))
+            )
+    except OSError:
+        # Missing, unreadable or not a directory: same as glob's []
+        csv_files = []
     
     if not csv_files:
         print(f"❌ ERROR: No CSV files found!")
         print(f"Files in directory:")
-        for f in os.listdir('.')[:20]:
-            print(f"  - {f}")
+        try:
+            with os.scandir(directory or '.') as entries:
+                for entry in islice(entries, 20):
+                    # Don't follow symlinks, so a dangling one can't fail
+                    size = entry.stat(follow_symlinks=False).st_size
+                    print(f"  - {entry.name} ({size:,} bytes)")
+        except OSError as e:
+            print(f"  (cannot list {directory or '.'}: {e})")
         sys.exit(1)
     
     print(f"✓ Found {len(csv_files)} CSV files\n")
     
-    geojson = {"type": "FeatureCollection", "features": []}
+    # First file has headers, others don't - read them once for all workers
+    with open(csv_files[0], 'r', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        headers = next(csv.reader(f))
+    print(f"✓ First file has headers - using them for all files\n")
+    
     tree_types = set()
     year_range = {'min': float('inf'), 'max': float('-inf')}
     
@@ -46,103 +260,71 @@ def combine_csv_files(pattern='arbres-part-*.csv', output_file='trees_combined.j
     total_valid = 0
     total_skipped = 0
     trees_with_dates = 0
-    headers = None  # Store headers from first file
     
-    # Process each file
-    for i, csv_file in enumerate(csv_files, 1):
-        print(f"[{i}/{len(csv_files)}] Processing {csv_file}...")
+    # Files are independent, so read them in parallel and merge in order
+    processes = min(len(csv_files), os.cpu_count() or 1)
+    print(f"Reading with {processes} worker processes...\n")
+    chunks = {name: [] for name in COLUMNS}
+    with Pool(processes=processes) as pool:
+        results = [
+            pool.apply_async(process_file, (csv_file, None if i == 1 else headers))
+            for i, csv_file in enumerate(csv_files, 1)
+        ]
         
-        try:
-            file_rows = 0
-            file_valid = 0
-            file_skipped = 0
+        for i, (csv_file, result) in enumerate(zip(csv_files, results), 1):
+            print(f"[{i}/{len(csv_files)}] Processing {csv_file}...")
             
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                # First file has headers, others don't
-                if i == 1:
-                    reader = csv.DictReader(f)
-                    headers = reader.fieldnames
-                    print(f"    ✓ First file has headers - using them for all files")
-                else:
-                    # Use headers from first file
-                    reader = csv.DictReader(f, fieldnames=headers)
-                
-                for row in reader:
-                    file_rows += 1
-                    total_rows += 1
-                    
-                    # Get coordinates
-                    try:
-                        lon = float(row.get('Longitude', 0))
-                        lat = float(row.get('Latitude', 0))
-                        
-                        if lon == 0 or lat == 0 or abs(lon) < 10 or abs(lat) < 10:
-                            file_skipped += 1
-                            total_skipped += 1
-                            continue
-                            
-                    except (ValueError, TypeError):
-                        file_skipped += 1
-                        total_skipped += 1
-                        continue
-                    
-                    # Parse year
-                    year = parse_date(row.get('Date_Plantation', ''))
-                    if year:
-                        trees_with_dates += 1
-                        year_range['min'] = min(year_range['min'], year)
-                        year_range['max'] = max(year_range['max'], year)
-                    
-                    # Tree types - use French for dropdown
-                    tree_type_latin = row.get('Essence_latin', 'Unknown') or 'Unknown'
-                    tree_type_french = row.get('Essence_fr', 'Inconnu') or 'Inconnu'
-                    tree_type_english = row.get('Essence_en', 'Unknown') or 'Unknown'
-                    tree_types.add(tree_type_french)
-                    
-                    # Create feature with FULL property names
-                    geojson["features"].append({
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [lon, lat]
-                        },
-                        "properties": {
-                            "arrondissement": row.get('Arrond_Nom', '') or '',
-                            "rue": (row.get('Rue_Nom', '') or '').strip(),
-                            "emplacement": (row.get('Emplacement', '') or '').strip(),
-                            "tree_type_latin": tree_type_latin,
-                            "tree_type_french": tree_type_french,
-                            "tree_type_english": tree_type_english,
-                            "diameter": row.get('DHP', '') or '',
-                            "plantation_year": year if year else 0,
-                        }
-                    })
-                    
-                    file_valid += 1
-                    total_valid += 1
+            try:
+                columns, file_types, file_min, file_max, counts = result.get()
+            except Exception as e:
+                print(f"    ❌ ERROR: {e}")
+                continue
             
-            print(f"    Rows: {file_rows:,} | Valid: {file_valid:,} | Skipped: {file_skipped:,}")
+            if counts['valid']:
+                for name in COLUMNS:
+                    chunks[name].append(columns[name])
             
-        except Exception as e:
-            print(f"    ❌ ERROR: {e}")
-            continue
+            tree_types |= file_types
+            if file_min is not None:
+                year_range['min'] = min(year_range['min'], file_min)
+                year_range['max'] = max(year_range['max'], file_max)
+            
+            total_rows += counts['rows']
+            total_valid += counts['valid']
+            total_skipped += counts['skipped']
+            trees_with_dates += counts['with_dates']
+            print(f"    Rows: {counts['rows']:,} | Valid: {counts['valid']:,} | Skipped: {counts['skipped']:,}")
     
-    # Add metadata
-    geojson["metadata"] = {
-        "total_trees": len(geojson["features"]),
+    # Add metadata. The sorted tree type list for the dropdown is
+    # dictionaries["tree_type_french"], and no timestamp is written so
+    # unchanged input produces an identical file
+    metadata = {
+        "total_trees": total_valid,
         "trees_with_dates": trees_with_dates,
         "year_range": {
             "min": year_range['min'] if year_range['min'] != float('inf') else None,
             "max": year_range['max'] if year_range['max'] != float('-inf') else None
-        },
-        "tree_types": sorted(list(tree_types)),
-        "generated_at": datetime.now().isoformat()
+        }
     }
     
-    # Write JSON (compact format)
+    # Renumber dictionary ids against one lookup table per column
+    dictionaries = {}
+    for name in DICTIONARY_COLUMNS:
+        dictionaries[name], chunks[name] = merge_dictionaries(chunks[name])
+    
+    # Write JSON (compact format), one array per column
     print(f"\n📝 Writing {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+    with open(output_file, 'wb', buffering=BUFFER_SIZE) as out:
+        out.write(b'{"columns":{')
+        for n, name in enumerate(COLUMNS):
+            out.write(b'%s"%s":[' % (b',' if n else b'', name.encode()))
+            out.write(b','.join(chunks[name]))
+            out.write(b']')
+        out.write(b'},"dictionaries":')
+        out.write(dumps(dictionaries))
+        out.write(b',"metadata":')
+        out.write(dumps(metadata))
+        out.write(b'}')
     
     file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
     